@@ -46,6 +46,9 @@ class Config:
     MAX_OUTPUT_TOKENS = int(os.getenv("MAX_OUTPUT_TOKENS", "32768"))
     TEMPERATURE = float(os.getenv("TEMPERATURE", "0.7"))
     
+    # Translation settings
+    MAX_CONCURRENT_TRANSLATIONS = int(os.getenv("MAX_CONCURRENT_TRANSLATIONS", "8"))  # Parallel Gemini calls per response
+    
     # Retry settings
     MAX_RETRIES = int(os.getenv("MAX_RETRIES", "2"))
     CONFIDENCE_THRESHOLD = float(os.getenv("CONFIDENCE_THRESHOLD", "0.6"))
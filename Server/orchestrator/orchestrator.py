@@ -6,6 +6,7 @@ LangGraph-based orchestrator that handles context, understands queries,
 and routes to appropriate tools.
 """
 
+import asyncio
 import json
 import re
 import time
@@ -203,6 +204,38 @@ SCORING:
 Return ONLY valid JSON."""
 
 
+# =============================================================================
+# Response Parsing Patterns
+# =============================================================================
+
+# Precompiled since they run on every router/validator response
+JSON_OBJECT_RE = re.compile(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', re.DOTALL)
+CODE_FENCE_RE = re.compile(r'```(?:json)?\s*|\s*```')
+UNQUOTED_KEY_RE = re.compile(r'([,\{]\s*)(\w+)(\s*):')
+TRAILING_COMMA_RE = re.compile(r',(\s*[}\]])')
+
+# Display names for translation targets
+LANGUAGE_NAMES = {
+    'hi': 'Hindi',
+    'ta': 'Tamil',
+    'bn': 'Bengali',
+    'te': 'Telugu',
+    'gu': 'Gujarati',
+    'mr': 'Marathi',
+    'kn': 'Kannada',
+    'ml': 'Malayalam'
+}
+
+# Unicode script ranges used by _detect_language, checked in order
+SCRIPT_PATTERNS = (
+    ('hi', re.compile('[\u0900-\u097F]')),  # Devanagari (Hindi and related)
+    ('ta', re.compile('[\u0B80-\u0BFF]')),  # Tamil
+    ('bn', re.compile('[\u0980-\u09FF]')),  # Bengali
+    ('te', re.compile('[\u0C00-\u0C7F]')),  # Telugu
+    ('gu', re.compile('[\u0A80-\u0AFF]')),  # Gujarati
+)
+
+
 # =============================================================================
 # Orchestrator Class
 # =============================================================================
@@ -229,16 +262,45 @@ class ChanakyaOrchestrator:
         self.model_name = Config.GEMINI_MODEL
         self.logger = structlog.get_logger("chanakya.orchestrator")
         
-        # Initialize tools
+        # Generation configs never change between calls, so build them once
+        self.router_config = types.GenerateContentConfig(
+            system_instruction=ROUTER_PROMPT,
+            temperature=0.1,
+            max_output_tokens=Config.MAX_OUTPUT_TOKENS,
+            response_mime_type="application/json"
+        )
+        self.hallucination_config = types.GenerateContentConfig(
+            system_instruction=HALLUCINATION_DETECTION_PROMPT,
+            temperature=0.1,
+            max_output_tokens=10000,
+            response_mime_type="application/json"
+        )
+        self.summary_config = types.GenerateContentConfig(
+            temperature=0.3,
+            max_output_tokens=500,
+        )
+        self.translation_config = types.GenerateContentConfig(
+            temperature=0.3,
+            max_output_tokens=2048,
+        )
+        
+        # Initialize tools (sharing one client keeps a single HTTP connection pool)
         self.tools = {
-            "activity_generator": ActivityGeneratorTool(api_key=api_key),
-            "crisis_handler": CrisisHandlerTool(api_key=api_key),
-            "teacher_motivation": TeacherMotivationTool(api_key=api_key)
+            "activity_generator": ActivityGeneratorTool(api_key=api_key, client=self.client),
+            "crisis_handler": CrisisHandlerTool(api_key=api_key, client=self.client),
+            "teacher_motivation": TeacherMotivationTool(api_key=api_key, client=self.client)
         }
         
         # Conversation contexts (LRU cache to prevent memory leaks)
         self.contexts: LRUCache = LRUCache(maxsize=1000)
         
+        # Translated strings keyed by (target_lang, text); activity fields such
+        # as materials and fallback steps repeat often across requests
+        self.translations: LRUCache = LRUCache(maxsize=4096)
+        
+        # Router decisions keyed by the full routing prompt (query + history)
+        self.routing_cache: LRUCache = LRUCache(maxsize=1000)
+        
         # SQLite storage for persistent conversation history
         if Config.db.use_sqlite:
             self.storage = ConversationStorage()
@@ -247,6 +309,15 @@ class ChanakyaOrchestrator:
         
         # Build the LangGraph
         self.graph = self._build_graph()
+        
+        # Compiled lazily on first process() call and reused afterwards
+        self._compiled_graph = None
+    
+    def _get_compiled_graph(self):
+        """Compile the graph on first use and reuse it for later requests."""
+        if self._compiled_graph is None:
+            self._compiled_graph = self.graph.compile()
+        return self._compiled_graph
     
     def _detect_language(self, text: str) -> str:
         """
@@ -264,32 +335,12 @@ class ChanakyaOrchestrator:
         except UnicodeEncodeError:
             pass  # Contains non-ASCII characters, continue with Unicode detection
         
-        # Devanagari script range (Hindi and related languages)
-        devanagari_chars = sum(1 for char in text if '\u0900' <= char <= '\u097F')
-        
-        # If more than 30% Devanagari, it's Hindi
-        if len(text) > 0 and devanagari_chars / len(text) > 0.3:
-            return 'hi'
-        
-        # Tamil script range
-        tamil_chars = sum(1 for char in text if '\u0B80' <= char <= '\u0BFF')
-        if len(text) > 0 and tamil_chars / len(text) > 0.3:
-            return 'ta'
-        
-        # Bengali script range
-        bengali_chars = sum(1 for char in text if '\u0980' <= char <= '\u09FF')
-        if len(text) > 0 and bengali_chars / len(text) > 0.3:
-            return 'bn'
-        
-        # Telugu script range
-        telugu_chars = sum(1 for char in text if '\u0C00' <= char <= '\u0C7F')
-        if len(text) > 0 and telugu_chars / len(text) > 0.3:
-            return 'te'
-        
-        # Gujarati script range
-        gujarati_chars = sum(1 for char in text if '\u0A80' <= char <= '\u0AFF')
-        if len(text) > 0 and gujarati_chars / len(text) > 0.3:
-            return 'gu'
+        # Count script characters in C via the precompiled table;
+        # the first script covering more than 30% of the text wins
+        text_length = len(text)
+        for lang_code, script_re in SCRIPT_PATTERNS:
+            if len(script_re.findall(text)) / text_length > 0.3:
+                return lang_code
         
         # Default to English
         return 'en'
@@ -308,18 +359,12 @@ class ChanakyaOrchestrator:
         if target_lang == 'en':
             return text
         
-        lang_names = {
-            'hi': 'Hindi',
-            'ta': 'Tamil',
-            'bn': 'Bengali',
-            'te': 'Telugu',
-            'gu': 'Gujarati',
-            'mr': 'Marathi',
-            'kn': 'Kannada',
-            'ml': 'Malayalam'
-        }
+        target_name = LANGUAGE_NAMES.get(target_lang, target_lang)
         
-        target_name = lang_names.get(target_lang, target_lang)
+        cache_key = (target_lang, text)
+        cached = self.translations.get(cache_key)
+        if cached is not None:
+            return cached
         
         try:
             response = await self.client.aio.models.generate_content(
@@ -330,13 +375,12 @@ class ChanakyaOrchestrator:
                         parts=[types.Part(text=f"Translate this to {target_name} (preserve formatting):\n\n{text}")]
                     )
                 ],
-                config=types.GenerateContentConfig(
-                    temperature=0.3,
-                    max_output_tokens=2048,
-                )
+                config=self.translation_config
             )
             
-            return response.text.strip()
+            translated = response.text.strip()
+            self.translations[cache_key] = translated
+            return translated
             
         except Exception as e:
             self.logger.warning("translation_failed",
@@ -345,6 +389,21 @@ class ChanakyaOrchestrator:
             )
             return text  # Return original if translation fails
     
+    async def _translate_many(self, texts: List[str], target_lang: str) -> List[str]:
+        """
+        Translate several texts concurrently, preserving order.
+        
+        Concurrency is capped by Config.MAX_CONCURRENT_TRANSLATIONS so a long
+        activity does not fire dozens of Gemini requests at once.
+        """
+        semaphore = asyncio.Semaphore(Config.MAX_CONCURRENT_TRANSLATIONS)
+        
+        async def translate(text: str) -> str:
+            async with semaphore:
+                return await self._translate_text(text, target_lang)
+        
+        return list(await asyncio.gather(*(translate(text) for text in texts)))
+    
     
     def _build_graph(self) -> StateGraph:
         """Build the enhanced LangGraph workflow with conditional routing."""
@@ -397,7 +456,8 @@ class ChanakyaOrchestrator:
         
         workflow.add_edge("handle_follow_up", END)
         
-        # Return uncompiled workflow - we'll compile with checkpointer later
+        # Return uncompiled workflow - process() reuses a checkpointer-less compile,
+        # process_streaming() compiles its own with a MemorySaver
         return workflow
     
     async def _understand_query_node(self, state: OrchestratorState) -> dict:
@@ -412,7 +472,8 @@ class ChanakyaOrchestrator:
             self.contexts[session_id] = ConversationContext(session_id=session_id)
             
             # Load previous messages from SQLite if available
-            if self.storage and await self.storage.session_exists(session_id):
+            # (unknown sessions just return no rows, so no separate existence check)
+            if self.storage:
                 prev_messages = await self.storage.get_messages(session_id, limit=Config.MAX_CONTEXT_MESSAGES)
                 for msg in prev_messages:
                     self.contexts[session_id].add_message(msg["role"], msg["content"])
@@ -448,13 +509,21 @@ class ChanakyaOrchestrator:
         query = state["query"]
         messages = state.get("messages", [])
         
-        # Build context string from previous messages
+        # Build context string from previous messages (single join, no += copies)
         context_str = ""
         if len(messages) > 1:
-            context_str = "Previous conversation:\n"
-            for msg in messages[:-1]:  # All except current
-                context_str += f"{msg['role']}: {msg['content']}\n"
-            context_str += "\nCurrent query: "
+            history = "".join(
+                f"{msg['role']}: {msg['content']}\n" for msg in messages[:-1]  # All except current
+            )
+            context_str = f"Previous conversation:\n{history}\nCurrent query: "
+        
+        prompt = f"{context_str}Route this teacher query: {query}"
+        
+        # Routing runs at temperature 0.1, so an identical prompt gets the same decision
+        cached = self.routing_cache.get(prompt)
+        if cached is not None:
+            self.logger.info("router_cache_hit", tool=cached["selected_tool"], query=query[:50])
+            return dict(cached)
         
         try:
             response = await self.client.aio.models.generate_content(
@@ -462,15 +531,10 @@ class ChanakyaOrchestrator:
                 contents=[
                     types.Content(
                         role="user",
-                        parts=[types.Part(text=f"{context_str}Route this teacher query: {query}")]
+                        parts=[types.Part(text=prompt)]
                     )
                 ],
-                config=types.GenerateContentConfig(
-                    system_instruction=ROUTER_PROMPT,
-                    temperature=0.1,
-                    max_output_tokens=Config.MAX_OUTPUT_TOKENS,
-                    response_mime_type="application/json"
-                )
+                config=self.router_config
             )
             
             # Parse response
@@ -488,7 +552,7 @@ class ChanakyaOrchestrator:
             
             # Robust JSON extraction using regex
             # Try to find JSON object in response
-            json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', text, re.DOTALL)
+            json_match = JSON_OBJECT_RE.search(text)
             
             if not json_match:
                 # Fallback: clean up markdown code blocks
@@ -525,13 +589,19 @@ class ChanakyaOrchestrator:
                     "confidence": 0.5,
                 }
             
-            return {
+            decision = {
                 "selected_tool": parsed.get("selected_tool", "activity_generator"),
                 "tool_reasoning": parsed.get("reasoning", "Default selection"),
                 "intent": parsed.get("extracted_topic", query),
                 "confidence": float(parsed.get("confidence", 0.8)),
             }
             
+            # Only cache confident decisions so low-confidence retries still re-ask Gemini
+            if decision["confidence"] >= Config.CONFIDENCE_THRESHOLD:
+                self.routing_cache[prompt] = decision
+            
+            return dict(decision)
+            
         except Exception:
             # Default to activity generator on error
             return {
@@ -581,12 +651,7 @@ TIPS: {', '.join(activity_output.get('tips', [])) if activity_output.get('tips')
                         parts=[types.Part(text=f"Validate this activity:\n\n{activity_text}")]
                     )
                 ],
-                config=types.GenerateContentConfig(
-                    system_instruction=HALLUCINATION_DETECTION_PROMPT,
-                    temperature=0.1,
-                    max_output_tokens=10000,
-                    response_mime_type="application/json"
-                )
+                config=self.hallucination_config
             )
             
             # Check if response was truncated
@@ -601,8 +666,8 @@ TIPS: {', '.join(activity_output.get('tips', [])) if activity_output.get('tips')
             text = response.text.strip()
             
             # Robust JSON extraction - remove markdown code blocks
-            text = re.sub(r'```(?:json)?\s*|\s*```', '', text)
-            json_match = re.search(r'\{[^{}]*(?:\{[^{}]*\}[^{}]*)*\}', text, re.DOTALL)
+            text = CODE_FENCE_RE.sub('', text)
+            json_match = JSON_OBJECT_RE.search(text)
             if json_match:
                 text = json_match.group()
             
@@ -614,9 +679,9 @@ TIPS: {', '.join(activity_output.get('tips', [])) if activity_output.get('tips')
                 # Fix common issues:
                 try:
                     # 1. Add quotes around unquoted property names (at start, after {, or after ,)
-                    text = re.sub(r'([,\{]\s*)(\w+)(\s*):', r'\1"\2"\3:', text)
+                    text = UNQUOTED_KEY_RE.sub(r'\1"\2"\3:', text)
                     # 2. Remove trailing commas before closing braces/brackets  
-                    text = re.sub(r',(\s*[}\]])', r'\1', text)
+                    text = TRAILING_COMMA_RE.sub(r'\1', text)
                     validation_result = json.loads(text)
                 except json.JSONDecodeError:
                     # If still failing, save to file for debugging and re-raise
@@ -688,10 +753,7 @@ TIPS: {', '.join(activity_output.get('tips', [])) if activity_output.get('tips')
                         parts=[types.Part(text=f"Summarize this teacher-student conversation concisely, preserving key topics and context:\n\n{conversation_text}")]
                     )
                 ],
-                config=types.GenerateContentConfig(
-                    temperature=0.3,
-                    max_output_tokens=500,
-                )
+                config=self.summary_config
             )
             
             summary = response.text.strip()
@@ -741,7 +803,7 @@ TIPS: {', '.join(activity_output.get('tips', [])) if activity_output.get('tips')
             return "end"
         
         # If confidence is too low, retry with modified query
-        if confidence < 0.6:
+        if confidence < Config.CONFIDENCE_THRESHOLD:
             return "retry"
         
         # Normal execution
@@ -1037,12 +1099,12 @@ TIPS: {', '.join(activity_output.get('tips', [])) if activity_output.get('tips')
         }
         
         try:
-            # Run the graph with config for checkpointing
+            # Run the graph, tagged with the session as its thread
             config = {"configurable": {"thread_id": session_id}}
             
-            # Use in-memory checkpointer for LangGraph state
-            compiled_graph = self.graph.compile(checkpointer=MemorySaver())
-            final_state = await compiled_graph.ainvoke(initial_state, config=config)
+            # Reuse the compiled graph; every call starts from a full initial state,
+            # so no checkpointer is needed here
+            final_state = await self._get_compiled_graph().ainvoke(initial_state, config=config)
             
             processing_time_ms = (time.time() - start_time) * 1000
             
@@ -1086,29 +1148,21 @@ TIPS: {', '.join(activity_output.get('tips', [])) if activity_output.get('tips')
                     target_lang=detected_lang
                 )
                 
-                # Translate activity fields
-                result.activity_name = await self._translate_text(result.activity_name, detected_lang)
-                result.description = await self._translate_text(result.description, detected_lang)
-                result.learning_outcome = await self._translate_text(result.learning_outcome, detected_lang)
-                
-                # Translate steps
-                translated_steps = []
-                for step in result.steps:
-                    translated_steps.append(await self._translate_text(step, detected_lang))
-                result.steps = translated_steps
-                
-                # Translate materials
-                translated_materials = []
-                for material in result.materials_needed:
-                    translated_materials.append(await self._translate_text(material, detected_lang))
-                result.materials_needed = translated_materials
+                # Translate all activity fields concurrently, keeping their order
+                tips = result.tips or []
+                n_steps = len(result.steps)
+                n_materials = len(result.materials_needed)
+                translated = await self._translate_many(
+                    [result.activity_name, result.description, result.learning_outcome,
+                     *result.steps, *result.materials_needed, *tips],
+                    detected_lang
+                )
                 
-                # Translate tips if present
+                result.activity_name, result.description, result.learning_outcome = translated[:3]
+                result.steps = translated[3:3 + n_steps]
+                result.materials_needed = translated[3 + n_steps:3 + n_steps + n_materials]
                 if result.tips:
-                    translated_tips = []
-                    for tip in result.tips:
-                        translated_tips.append(await self._translate_text(tip, detected_lang))
-                    result.tips = translated_tips
+                    result.tips = translated[3 + n_steps + n_materials:]
             
             # Update conversation context and save to SQLite
             assistant_message = f"Generated activity: {result.activity_name if isinstance(result, ActivityOutput) else 'Response'}"
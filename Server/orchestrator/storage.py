@@ -6,6 +6,7 @@ Async persistent storage for chat history using aiosqlite.
 import aiosqlite
 import json
 import os
+from contextlib import asynccontextmanager
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
@@ -31,9 +32,20 @@ class ConversationStorage:
             await self._init_db()
             self._initialized = True
     
+    @asynccontextmanager
+    async def _connect(self):
+        """Open a connection tuned for many small writes."""
+        async with aiosqlite.connect(self.db_path) as db:
+            # WAL makes NORMAL sync safe and avoids an fsync per commit
+            await db.execute("PRAGMA synchronous=NORMAL")
+            yield db
+    
     async def _init_db(self):
         """Create tables if they don't exist."""
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
+            # Journal mode is persistent, so setting it once per file is enough
+            await db.execute("PRAGMA journal_mode=WAL")
+            
             # Conversations table
             await db.execute("""
                 CREATE TABLE IF NOT EXISTS conversations (
@@ -70,7 +82,7 @@ class ConversationStorage:
         await self._ensure_initialized()
         now = datetime.utcnow().isoformat()
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             try:
                 await db.execute("""
                     INSERT INTO conversations (session_id, created_at, updated_at, metadata)
@@ -88,7 +100,7 @@ class ConversationStorage:
         await self._ensure_initialized()
         now = datetime.utcnow().isoformat()
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             # Ensure session exists
             await db.execute("""
                 INSERT OR IGNORE INTO conversations (session_id, created_at, updated_at, metadata)
@@ -113,7 +125,7 @@ class ConversationStorage:
         """Get messages for a conversation."""
         await self._ensure_initialized()
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             db.row_factory = aiosqlite.Row
             
             if limit:
@@ -135,21 +147,13 @@ class ConversationStorage:
                 """, (session_id,))
                 rows = await cursor.fetchall()
             
-            return [
-                {
-                    "role": row["role"],
-                    "content": row["content"],
-                    "timestamp": row["timestamp"],
-                    "metadata": json.loads(row["metadata"])
-                }
-                for row in rows
-            ]
+            return [self._row_to_message(row) for row in rows]
     
     async def get_session(self, session_id: str) -> Optional[Dict]:
         """Get session info."""
         await self._ensure_initialized()
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute("""
                 SELECT session_id, created_at, updated_at, metadata
@@ -159,19 +163,14 @@ class ConversationStorage:
             
             row = await cursor.fetchone()
             if row:
-                return {
-                    "session_id": row["session_id"],
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                    "metadata": json.loads(row["metadata"])
-                }
+                return self._row_to_session(row)
             return None
     
     async def session_exists(self, session_id: str) -> bool:
         """Check if session exists."""
         await self._ensure_initialized()
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             cursor = await db.execute("""
                 SELECT 1 FROM conversations WHERE session_id = ?
             """, (session_id,))
@@ -182,7 +181,7 @@ class ConversationStorage:
         """Get number of messages in a session."""
         await self._ensure_initialized()
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute("""
                 SELECT COUNT(*) as count FROM messages WHERE session_id = ?
@@ -194,7 +193,7 @@ class ConversationStorage:
         """Delete a session and all its messages."""
         await self._ensure_initialized()
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             await db.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
             cursor = await db.execute("DELETE FROM conversations WHERE session_id = ?", (session_id,))
             await db.commit()
@@ -204,7 +203,7 @@ class ConversationStorage:
         """Get most recent sessions."""
         await self._ensure_initialized()
         
-        async with aiosqlite.connect(self.db_path) as db:
+        async with self._connect() as db:
             db.row_factory = aiosqlite.Row
             cursor = await db.execute("""
                 SELECT c.session_id, c.created_at, c.updated_at, c.metadata,
@@ -218,13 +217,7 @@ class ConversationStorage:
             
             rows = await cursor.fetchall()
             return [
-                {
-                    "session_id": row["session_id"],
-                    "created_at": row["created_at"],
-                    "updated_at": row["updated_at"],
-                    "metadata": json.loads(row["metadata"]),
-                    "message_count": row["message_count"]
-                }
+                {**self._row_to_session(row), "message_count": row["message_count"]}
                 for row in rows
             ]
     
@@ -235,18 +228,34 @@ class ConversationStorage:
         from datetime import timedelta
         cutoff = (datetime.utcnow() - timedelta(days=days)).isoformat()
         
-        async with aiosqlite.connect(self.db_path) as db:
-            # Get sessions to delete
+        async with self._connect() as db:
+            # Set-based deletes instead of two statements per session
+            await db.execute("""
+                DELETE FROM messages WHERE session_id IN (
+                    SELECT session_id FROM conversations WHERE updated_at < ?
+                )
+            """, (cutoff,))
             cursor = await db.execute("""
-                SELECT session_id FROM conversations WHERE updated_at < ?
+                DELETE FROM conversations WHERE updated_at < ?
             """, (cutoff,))
-            sessions = await cursor.fetchall()
-            
-            # Delete messages and conversations
-            for session in sessions:
-                session_id = session[0]
-                await db.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
-                await db.execute("DELETE FROM conversations WHERE session_id = ?", (session_id,))
             
             await db.commit()
-            return len(sessions)
+            return cursor.rowcount
+    
+    def _row_to_message(self, row) -> Dict:
+        """Convert a messages row to a message dict."""
+        return {
+            "role": row["role"],
+            "content": row["content"],
+            "timestamp": row["timestamp"],
+            "metadata": json.loads(row["metadata"])
+        }
+    
+    def _row_to_session(self, row) -> Dict:
+        """Convert a conversations row to a session dict."""
+        return {
+            "session_id": row["session_id"],
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "metadata": json.loads(row["metadata"])
+        }
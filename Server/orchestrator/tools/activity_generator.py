@@ -227,6 +227,10 @@ Topic: "Gravity and falling objects"
 - The activity must directly teach the concept, not just be vaguely related to it"""
 
 
+# Matches the trailing JSON object in the model output
+TRAILING_JSON_RE = re.compile(r'\{[\s\S]*?\}(?=\s*$)', re.DOTALL)
+
+
 class ActivityGeneratorTool:
     """
     Tool for generating simple classroom activities to help students understand concepts.
@@ -235,14 +239,15 @@ class ActivityGeneratorTool:
     name: str = "activity_generator"
     description: str = "Generates simple, practical classroom activities using basic materials to help students understand concepts"
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, client: Optional[genai.Client] = None):
         """
         Initialize the activity generator with Gemini API.
         
         Args:
             api_key: Google AI API key
+            client: Optional existing Gemini client to share connections with
         """
-        self.client = genai.Client(api_key=api_key)
+        self.client = client or genai.Client(api_key=api_key)
         self.model_name = "gemini-2.5-flash"
     
     async def run(self, topic: str, context: Optional[dict] = None) -> ActivityOutput:
@@ -304,7 +309,7 @@ class ActivityGeneratorTool:
             text = text.strip()
             
             # Try to extract JSON if wrapped in other text - use non-greedy match
-            json_match = re.search(r'\{[\s\S]*?\}(?=\s*$)', text, re.DOTALL)
+            json_match = TRAILING_JSON_RE.search(text)
             if json_match:
                 text = json_match.group()
             
@@ -170,6 +170,10 @@ EXAMPLE 5 - Low Energy Boost:
 Return ONLY valid JSON."""
 
 
+# JSON object at the end of a (possibly chatty) model response
+TRAILING_JSON_RE = re.compile(r'\{[\s\S]*?\}(?=\s*$)', re.DOTALL)
+
+
 class CrisisHandlerTool:
     """
     Tool for handling classroom management crises.
@@ -178,14 +182,15 @@ class CrisisHandlerTool:
     name: str = "crisis_handler"
     description: str = "Provides immediate solutions for classroom management issues like noise, chaos, lack of focus, or disruptive behavior"
     
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, client: Optional[genai.Client] = None):
         """
         Initialize the crisis handler with Gemini API.
         
         Args:
             api_key: Google AI API key
+            client: Optional existing Gemini client to share connections with
         """
-        self.client = genai.Client(api_key=api_key)
+        self.client = client or genai.Client(api_key=api_key)
         self.model_name = "gemini-2.5-flash"
     
     async def run(self, crisis_description: str, context: Optional[dict] = None) -> ActivityOutput:
@@ -247,7 +252,7 @@ class CrisisHandlerTool:
             text = text.strip()
             
             # Try to extract JSON if wrapped in other text
-            json_match = re.search(r'\{[\s\S]*?\}(?=\s*$)', text, re.DOTALL)
+            json_match = TRAILING_JSON_RE.search(text)
             if json_match:
                 text = json_match.group()
             
@@ -66,6 +66,11 @@ Return ONLY valid JSON, no other text.
 """
 
 
+# Markdown fences Gemini sometimes wraps around JSON
+LEADING_FENCE_RE = re.compile(r'^```json\s*')
+TRAILING_FENCE_RE = re.compile(r'\s*```$')
+
+
 class TeacherMotivationTool(BaseTool):
     """
     Tool for providing motivation and burnout recovery support to teachers.
@@ -74,9 +79,9 @@ class TeacherMotivationTool(BaseTool):
     name = "teacher_motivation"
     description = "Provides motivation, tips, and recovery strategies for teachers experiencing burnout or lack of motivation"
     
-    def __init__(self, api_key: str):
-        """Initialize with Google API key."""
-        self.client = genai.Client(api_key=api_key)
+    def __init__(self, api_key: str, client: Optional[genai.Client] = None):
+        """Initialize with Google API key, optionally sharing an existing client."""
+        self.client = client or genai.Client(api_key=api_key)
         self.model_name = "gemini-2.0-flash-exp"
     
     async def run(self, query: str, context: Optional[dict] = None) -> dict:
@@ -112,8 +117,8 @@ class TeacherMotivationTool(BaseTool):
         response_text = response.text.strip()
         
         # Clean up response (remove markdown, extra formatting)
-        response_text = re.sub(r'^```json\s*', '', response_text)
-        response_text = re.sub(r'\s*```$', '', response_text)
+        response_text = LEADING_FENCE_RE.sub('', response_text)
+        response_text = TRAILING_FENCE_RE.sub('', response_text)
         
         try:
             result = json.loads(response_text)
@@ -94,6 +94,10 @@ Return ONLY valid JSON, no other text.
 """
 
 
+LEADING_FENCE_RE = re.compile(r'^```json\s*')
+TRAILING_FENCE_RE = re.compile(r'\s*```$')
+
+
 class TeachingFeedbackAnalyzer:
     """
     Analyzes teaching sessions and generates feedback.
@@ -147,8 +151,8 @@ class TeachingFeedbackAnalyzer:
             
             # Parse response
             response_text = response.text.strip()
-            response_text = re.sub(r'^```json\s*', '', response_text)
-            response_text = re.sub(r'\s*```$', '', response_text)
+            response_text = LEADING_FENCE_RE.sub('', response_text)
+            response_text = TRAILING_FENCE_RE.sub('', response_text)
             
             analysis = json.loads(response_text)
             
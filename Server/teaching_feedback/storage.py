@@ -7,6 +7,7 @@ Handles database storage of teaching feedback (without storing transcripts).
 
 import json
 import sqlite3
+from collections import Counter
 from typing import Optional, List
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -25,13 +26,35 @@ class FeedbackStorage:
         self.db_path = Path(db_path)
         # Ensure data directory exists
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn: Optional[sqlite3.Connection] = None
         self._initialize_db()
     
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Return the shared connection, opening it on first use.
+        
+        Keeping one connection alive lets sqlite3's statement cache
+        reuse the prepared INSERT/SELECT statements across calls.
+        """
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path)
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        return self._conn
+    
+    def close(self):
+        """Close the shared database connection."""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+    
     def _initialize_db(self):
         """Create database tables if they don't exist."""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
+        # WAL is stored in the file; NORMAL sync is safe under it
+        cursor.execute("PRAGMA journal_mode=WAL")
+        
         # Feedback table - stores only feedback, NOT transcripts
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS teaching_feedback (
@@ -62,7 +85,6 @@ class FeedbackStorage:
         """)
         
         conn.commit()
-        conn.close()
     
     def save_feedback(self, feedback: TeachingFeedback, teacher_id: Optional[str] = None) -> bool:
         """
@@ -76,7 +98,7 @@ class FeedbackStorage:
             True if saved successfully
         """
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -107,7 +129,6 @@ class FeedbackStorage:
             ))
             
             conn.commit()
-            conn.close()
             return True
             
         except Exception as e:
@@ -125,7 +146,7 @@ class FeedbackStorage:
             TeachingFeedback object or None
         """
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
             cursor.execute("""
@@ -133,7 +154,6 @@ class FeedbackStorage:
             """, (session_id,))
             
             row = cursor.fetchone()
-            conn.close()
             
             if not row:
                 return None
@@ -156,20 +176,17 @@ class FeedbackStorage:
             FeedbackHistory with statistics and recent sessions
         """
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
             cursor = conn.cursor()
             
-            # Get all feedbacks for teacher
+            # Aggregate in SQL so only the rows we return get fully decoded
             cursor.execute("""
-                SELECT * FROM teaching_feedback 
-                WHERE teacher_id = ? 
-                ORDER BY timestamp DESC
+                SELECT COUNT(*), AVG(overall_score) FROM teaching_feedback
+                WHERE teacher_id = ?
             """, (teacher_id,))
+            total_sessions, average_score = cursor.fetchone()
             
-            rows = cursor.fetchall()
-            conn.close()
-            
-            if not rows:
+            if not total_sessions:
                 return FeedbackHistory(
                     teacher_id=teacher_id,
                     total_sessions=0,
@@ -180,47 +197,51 @@ class FeedbackStorage:
                     recurring_gaps=[]
                 )
             
-            # Calculate statistics
-            all_feedbacks = [self._row_to_feedback(row) for row in rows]
-            total_sessions = len(all_feedbacks)
-            average_score = sum(f.overall_score for f in all_feedbacks) / total_sessions
+            # Recent feedbacks are the only full rows we need
+            cursor.execute("""
+                SELECT * FROM teaching_feedback 
+                WHERE teacher_id = ? 
+                ORDER BY timestamp DESC
+                LIMIT ?
+            """, (teacher_id, max(limit, 6)))
+            recent_rows = cursor.fetchall()
+            
+            # Pattern counting only needs the two list columns
+            cursor.execute("""
+                SELECT key_strengths, improvement_areas FROM teaching_feedback
+                WHERE teacher_id = ?
+                ORDER BY timestamp DESC
+            """, (teacher_id,))
+            pattern_rows = cursor.fetchall()
             
             # Determine trend (compare last 3 vs previous 3)
             improvement_trend = "stable"
             if total_sessions >= 6:
-                recent_avg = sum(f.overall_score for f in all_feedbacks[:3]) / 3
-                older_avg = sum(f.overall_score for f in all_feedbacks[3:6]) / 3
+                scores = [row[7] for row in recent_rows[:6]]
+                recent_avg = sum(scores[:3]) / 3
+                older_avg = sum(scores[3:6]) / 3
                 if recent_avg > older_avg + 0.1:
                     improvement_trend = "improving"
                 elif recent_avg < older_avg - 0.1:
                     improvement_trend = "declining"
             
-            # Find common patterns
-            all_strengths = []
-            all_gaps = []
-            for f in all_feedbacks:
-                all_strengths.extend(f.key_strengths)
-                all_gaps.extend(f.improvement_areas)
-            
-            # Count frequency
-            strength_counts = {}
-            for s in all_strengths:
-                strength_counts[s] = strength_counts.get(s, 0) + 1
-            
-            gap_counts = {}
-            for g in all_gaps:
-                gap_counts[g] = gap_counts.get(g, 0) + 1
+            # Count frequency of recurring patterns
+            strength_counts = Counter()
+            gap_counts = Counter()
+            for strengths_json, gaps_json in pattern_rows:
+                strength_counts.update(json.loads(strengths_json))
+                gap_counts.update(json.loads(gaps_json))
             
-            # Top recurring items
-            common_strengths = sorted(strength_counts.items(), key=lambda x: x[1], reverse=True)[:3]
-            recurring_gaps = sorted(gap_counts.items(), key=lambda x: x[1], reverse=True)[:3]
+            # Top recurring items (heap-based, no full sort)
+            common_strengths = strength_counts.most_common(3)
+            recurring_gaps = gap_counts.most_common(3)
             
             return FeedbackHistory(
                 teacher_id=teacher_id,
                 total_sessions=total_sessions,
                 average_score=average_score,
                 improvement_trend=improvement_trend,
-                recent_feedbacks=all_feedbacks[:limit],
+                recent_feedbacks=[self._row_to_feedback(row) for row in recent_rows[:limit]],
                 common_strengths=[s[0] for s in common_strengths],
                 recurring_gaps=[g[0] for g in recurring_gaps]
             )